@@ -1,3 +1,4 @@
+from . import beejson
 from . import beeconfig
 from . import beehbase
 from . import beekafka
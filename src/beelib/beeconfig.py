@@ -1,11 +1,19 @@
-import json
 import os
 import re
 
+from . import beejson
+
+_NEO4J_RE = re.compile(r'neo4j')
+_CONF_CACHE = {}
+
 def read_config(conf_file=None):
     """
     Read configuration from a file or environment variable.
 
+    The file contents are cached per file path and only re-read when the file
+    modification time or size changes. Each call parses them again, so every
+    call returns a new dictionary that callers can modify.
+
     Parameters:
     - conf_file (str, optional): Path to the configuration file. If not provided,
       the environment variable 'CONF_FILE' is used.
@@ -14,11 +22,16 @@ def read_config(conf_file=None):
     - dict: The loaded configuration as a dictionary. Special handling is applied
       to Neo4j-related keys to convert 'auth' values to tuples.
     """
-    if conf_file:
-        conf = json.load(open(conf_file))
-    else:
-        conf = json.load(open(os.environ['CONF_FILE']))
-    for k in [re.match(r'neo4j.*', k).string for k in conf.keys() if re.match(r'neo4j.*', k) is not None]:
-        if 'auth' in conf[k]:
-            conf[k]['auth'] = tuple(conf[k]['auth'])
-    return conf
\ No newline at end of file
+    path = os.path.abspath(conf_file or os.environ['CONF_FILE'])
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _CONF_CACHE.get(path)
+    if cached is None or cached[0] != key:
+        with open(path, 'rb') as f:
+            cached = (key, f.read())
+        _CONF_CACHE[path] = cached
+    conf = beejson.loads(cached[1])
+    for k, v in conf.items():
+        if _NEO4J_RE.match(k) and 'auth' in v:
+            v['auth'] = tuple(v['auth'])
+    return conf
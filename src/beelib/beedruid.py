@@ -2,8 +2,6 @@ import time
 from datetime import datetime, timezone
 
 import isodate
-from pydruid.db import connect
-import pandas as pd
 
 def run_druid_query(druid_conf, query):
     """
@@ -16,6 +14,7 @@ def run_druid_query(druid_conf, query):
     Returns:
     - list: Results as a list of dictionaries, each representing a row.
     """
+    from pydruid.db import connect
     druid = connect(**druid_conf)
     cursor = druid.cursor()
     cursor.execute(query)
@@ -37,6 +36,7 @@ def get_timeseries_from_druid(d_hash, druid_connection, druid_datasource, ts_ini
     Returns:
     - pd.DataFrame: A DataFrame with time-indexed data.
     """
+    import pandas as pd
     druid_query = f"""
     SELECT
         t1."__time" AS "start",
@@ -1,6 +1,99 @@
+import queue
+import socket
 import uuid
-import happybase
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+POOL_SIZE = 8
+POOL_TIMEOUT = 60
+
+_pools = {}
+_table_filters = {}
+
+def __get_pool__(hbase_conf):
+    """
+    Get a shared HBase connection pool for a configuration.
+
+    Parameters:
+    - hbase_conf (dict): HBase connection configuration. An optional 'pool_size'
+      key sets the number of pooled connections (default POOL_SIZE).
+
+    Returns:
+    - happybase.ConnectionPool: The connection pool for this configuration.
+    """
+    import happybase
+    key = frozenset(hbase_conf.items())
+    pool = _pools.get(key)
+    if pool is None:
+        conf = dict(hbase_conf)
+        pool_size = conf.pop('pool_size', POOL_SIZE)
+        pool = happybase.ConnectionPool(size=pool_size, **conf)
+        _pools[key] = pool
+    return pool
+
+def __with_connection__(hbase_conf, func, timeout=None):
+    """
+    Run a function with a pooled HBase connection.
+
+    Pooled connections stay open between calls, and the Thrift server closes idle
+    ones (hbase.thrift.server.socket.read.timeout, 60 s by default). happybase only
+    replaces such a connection after a call has failed on it, so the function is
+    retried once on connection errors.
+
+    Parameters:
+    - hbase_conf (dict): HBase connection configuration.
+    - func (callable): Function receiving the happybase.Connection.
+    - timeout (int, optional): Seconds to wait for a free connection before raising
+      happybase.NoConnectionsAvailable. Waits forever if not given.
+
+    Returns:
+    - object: The result of `func`.
+    """
+    from thriftpy2.thrift import TException
+    pool = __get_pool__(hbase_conf)
+    try:
+        with pool.connection(timeout) as hbase:
+            return func(hbase)
+    except (TException, socket.error):
+        with pool.connection(timeout) as hbase:
+            return func(hbase)
+
+def close_hbase_pools():
+    """
+    Close the idle connections of all the HBase connection pools and forget them.
+    Connections in use when this is called are not closed.
+    """
+    while _pools:
+        _, pool = _pools.popitem()
+        while True:
+            try:
+                connection = pool._queue.get_nowait()
+            except queue.Empty:
+                break
+            connection.close()
+
+def __get_table_filter__(str_filter):
+    """
+    Compile a table name filter and extract its literal prefix.
+
+    Parameters:
+    - str_filter (str): Regex pattern to filter table names.
+
+    Returns:
+    - tuple: The literal prefix every match starts with and the compiled pattern.
+    """
+    if str_filter not in _table_filters:
+        prefix = ""
+        if "|" not in str_filter:
+            for c in str_filter.lstrip("^"):
+                if c in "*?{":
+                    prefix = prefix[:-1]
+                    break
+                if c in ".$+[]()\\":
+                    break
+                prefix += c
+        _table_filters[str_filter] = (prefix, re.compile(str_filter))
+    return _table_filters[str_filter]
 
 def get_tables(str_filter, hbase_conf):
     """
@@ -13,8 +106,9 @@ def get_tables(str_filter, hbase_conf):
     Returns:
     - list: List of matching table names as strings.
     """
-    hbase = happybase.Connection(**hbase_conf)
-    return [x.decode() for x in hbase.tables() if re.match(str_filter, x.decode())]
+    prefix, pattern = __get_table_filter__(str_filter)
+    tables = __with_connection__(hbase_conf, lambda hbase: [x.decode() for x in hbase.tables()])
+    return [x for x in tables if x.startswith(prefix) and pattern.match(x)]
 
 def __get_h_table__(hbase, table_name, cf=None):
     """
@@ -39,10 +133,40 @@ def __get_h_table__(hbase, table_name, cf=None):
             print(e)
     return hbase.table(table_name)
 
-def save_to_hbase(documents, h_table_name, hbase_conf, cf_mapping, row_fields=None, batch_size=1000):
+def __flush_bucket__(rows, h_table_name, hbase_conf, batch_size, wal=True, timeout=None):
+    """
+    Write a list of rows to HBase using a pooled connection.
+
+    Parameters:
+    - rows (list): List of (row_key, values) tuples to write.
+    - h_table_name (str): Name of the HBase table.
+    - hbase_conf (dict): HBase connection configuration.
+    - batch_size (int): Number of rows to batch per write.
+    - wal (bool, optional): Whether the writes go to the Write Ahead Log.
+    - timeout (int, optional): Seconds to wait for a free pooled connection.
+    """
+    def flush(hbase):
+        h_batch = hbase.table(h_table_name).batch(batch_size=batch_size, wal=wal)
+        for row, values in rows:
+            h_batch.put(row, values)
+        h_batch.send()
+    __with_connection__(hbase_conf, flush, timeout)
+
+def save_to_hbase(documents, h_table_name, hbase_conf, cf_mapping, row_fields=None, batch_size=1000,
+                  region_prefix_len=2, max_workers=None, wal=True, pool_timeout=POOL_TIMEOUT):
     """
     Save a list of documents to HBase.
 
+    Rows are grouped by the first `region_prefix_len` characters of their key and
+    each group is written in parallel from a thread pool. All the `documents` are
+    loaded into memory before anything is written.
+
+    The table creation and each writer thread take their own connection from the
+    pool of `hbase_conf`, so connections already held on the same configuration
+    (e.g. while iterating `get_hbase_data_batch`) are not available to them. The
+    pool must have more connections than those, otherwise the writers raise
+    happybase.NoConnectionsAvailable after waiting `pool_timeout` seconds.
+
     Parameters:
     - documents (list): List of dictionaries to save.
     - h_table_name (str): Name of the HBase table.
@@ -50,13 +174,19 @@ def save_to_hbase(documents, h_table_name, hbase_conf, cf_mapping, row_fields=No
     - cf_mapping (list): List of tuples specifying column family and fields.
     - row_fields (list, optional): Fields to use for generating row keys.
     - batch_size (int, optional): Number of rows to batch per write.
+    - region_prefix_len (int, optional): Length of the row key prefix used to group rows.
+    - max_workers (int, optional): Number of writer threads, defaults to the number of groups. It is
+      capped to the connection pool size.
+    - wal (bool, optional): Whether the writes go to the Write Ahead Log. Disabling it speeds up bulk loads
+      but the data may be lost if a region server fails before flushing, so only use it for data that can
+      be regenerated.
+    - pool_timeout (int, optional): Seconds a writer waits for a free pooled connection.
 
     Raises:
     - Exception: If column mapping is invalid.
+    - happybase.NoConnectionsAvailable: If a writer gets no pooled connection within `pool_timeout`.
     """
-    hbase = happybase.Connection(**hbase_conf)
-    table = __get_h_table__(hbase, h_table_name, {cf: {} for cf, _ in cf_mapping})
-    h_batch = table.batch(batch_size=batch_size)
+    buckets = {}
     row_auto = 0
     uid = uuid.uuid4()
     for d in documents:
@@ -77,11 +207,25 @@ def save_to_hbase(documents, h_table_name, hbase_conf, cf_mapping, row_fields=No
                         values[f"{cf}:{c}"] = str(d_[c])
             else:
                 raise Exception("Column mapping must be a list of fields or 'all'")
-        h_batch.put(str(row), values)
-    h_batch.send()
+        row = str(row)
+        buckets.setdefault(row[:region_prefix_len], []).append((row, values))
+
+    __with_connection__(hbase_conf, lambda hbase: __get_h_table__(hbase, h_table_name,
+                                                                  {cf: {} for cf, _ in cf_mapping}),
+                        pool_timeout)
+    if not buckets:
+        return
+    for rows in buckets.values():
+        rows.sort(key=lambda x: x[0])
+    pool_size = hbase_conf.get('pool_size', POOL_SIZE)
+    max_workers = min(max_workers or len(buckets), len(buckets), pool_size)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(
+            lambda rows: __flush_bucket__(rows, h_table_name, hbase_conf, batch_size, wal, pool_timeout),
+            buckets.values()))
 
 def get_hbase_data_batch(hbase_conf, hbase_table, row_start=None, row_stop=None, row_prefix=None, columns=None,
-                         _filter=None, timestamp=None, include_timestamp=False, batch_size=100000,
+                         _filter=None, timestamp=None, include_timestamp=False, batch_size=5000,
                          scan_batching=None, limit=None, sorted_columns=False, reverse=False):
     """
     Retrieve data from HBase in batches.
@@ -96,46 +240,68 @@ def get_hbase_data_batch(hbase_conf, hbase_table, row_start=None, row_stop=None,
     - _filter (str, optional): HBase filter string.
     - timestamp (int, optional): Timestamp for versioning.
     - include_timestamp (bool, optional): Whether to include timestamps in results.
-    - batch_size (int, optional): Number of rows per batch.
-    - scan_batching (int, optional): Maximum number of rows per RPC.
+    - batch_size (int, optional): Number of rows per batch, also used as the scanner caching (rows per RPC).
+    - scan_batching (int, optional): Maximum number of columns per row returned in each RPC. The number of
+      RPCs is roughly (rows * columns) / min(scan_batching, columns) / batch_size. Only set it (e.g. 500)
+      for very wide rows: rows with more cells are returned as several tuples with the same key, `limit`
+      counts each of them, and HBase rejects it together with row filters such as SingleColumnValueFilter.
     - limit (int, optional): Maximum number of rows to return.
     - sorted_columns (bool, optional): Whether columns are sorted.
     - reverse (bool, optional): Whether to scan in reverse.
 
+    The scan uses its own pooled connection and a single server-side scanner while the generator is
+    iterated. If the scanner expires because a batch took longer to process than the scanner lease
+    (hbase.client.scanner.timeout.period, 60 s by default), or the connection is closed, the scan is
+    resumed after the last row read. With `scan_batching` the error is raised instead.
+
     Yields:
     - list: Batches of rows as (row_key, columns) tuples.
     """
+    from thriftpy2.thrift import TException
+    pool = __get_pool__(hbase_conf)
     if row_prefix:
         row_start = row_prefix
         row_stop = row_prefix[:-1] + chr(ord(row_prefix[-1]) + 1)
 
-    if limit:
-        if limit > batch_size:
-            current_limit = batch_size
-        else:
-            current_limit = limit
-    else:
-        current_limit = batch_size
-    current_register = 0
-    while True:
-        hbase = happybase.Connection(**hbase_conf)
-        table = hbase.table(hbase_table)
-        data = list(table.scan(row_start=row_start, row_stop=row_stop, columns=columns, filter=_filter,
-                               timestamp=timestamp, include_timestamp=include_timestamp, batch_size=batch_size,
-                               scan_batching=scan_batching, limit=current_limit, sorted_columns=sorted_columns,
-                               reverse=reverse))
-        if not data:
-            break
-        yield data
-        if len(data) <= 1:
-            break
-
-        last_record = data[-1][0].decode()
-        current_register += len(data)
-
-        if limit:
-            if current_register >= limit:
-                break
+    # the connection is taken and returned explicitly instead of with pool.connection(), which binds
+    # it to the thread and would share it between generators interleaved in the same thread
+    hbase = pool._acquire_connection()
+    try:
+        data = []
+        count = 0
+        last_row = None
+        retried = False
+        while True:
+            if last_row is None:
+                scan_start, scan_limit = row_start, limit
             else:
-                current_limit = min(batch_size, limit - current_register)
-        row_start = last_record[:-1] + chr(ord(last_record[-1]) + 1)
\ No newline at end of file
+                # resume from the last row read, which the scan returns again and is skipped
+                scan_start, scan_limit = last_row, limit - count + 1 if limit else None
+            try:
+                hbase.open()
+                table = hbase.table(hbase_table)
+                scanner = table.scan(row_start=scan_start, row_stop=row_stop, columns=columns, filter=_filter,
+                                     timestamp=timestamp, include_timestamp=include_timestamp,
+                                     batch_size=batch_size, scan_batching=scan_batching, limit=scan_limit,
+                                     sorted_columns=sorted_columns, reverse=reverse)
+                for row in scanner:
+                    if row[0] == last_row:
+                        continue
+                    retried = False
+                    count += 1
+                    last_row = row[0]
+                    data.append(row)
+                    if len(data) >= batch_size:
+                        yield data
+                        data = []
+                break
+            except (TException, socket.error):
+                # with scan_batching the last row may have been read partially, so it can not be resumed
+                if retried or scan_batching:
+                    raise
+                retried = True
+                hbase._refresh_thrift_client()
+        if data:
+            yield data
+    finally:
+        pool._return_connection(hbase)
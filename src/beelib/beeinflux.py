@@ -1,27 +1,44 @@
 import time
 from datetime import datetime, timezone
-import influxdb_client
 import isodate
-import pandas as pd
+
+_influx_clients = {}
 
 def connect_influx(influx_connection):
     """
     Establish a connection to InfluxDB.
 
+    Clients are cached by url, org and token, so later calls with the same
+    connection reuse the client and its HTTP connection pool.
+
     Parameters:
     - influx_connection (dict): Configuration dictionary containing 'url', 'org', and 'token'.
 
     Returns:
     - influxdb_client.InfluxDBClient: An InfluxDB client instance.
     """
-    client = influxdb_client.InfluxDBClient(
-        url=influx_connection['connection']['url'],
-        org=influx_connection['connection']['org'],
-        token=influx_connection['connection']['token'],
-        timeout=60000
-    )
+    import influxdb_client
+    conn = influx_connection['connection']
+    key = (conn['url'], conn['org'], conn['token'])
+    client = _influx_clients.get(key)
+    if client is None:
+        client = influxdb_client.InfluxDBClient(
+            url=conn['url'],
+            org=conn['org'],
+            token=conn['token'],
+            timeout=60000
+        )
+        _influx_clients[key] = client
     return client
 
+def close_influx_clients():
+    """
+    Close and forget all the cached InfluxDB clients.
+    """
+    while _influx_clients:
+        _, client = _influx_clients.popitem()
+        client.close()
+
 def run_query(influx_connection, query):
     """
     Execute an InfluxDB query.
@@ -37,6 +54,24 @@ def run_query(influx_connection, query):
     query_api = client.query_api()
     return query_api.query_data_frame(query)
 
+def run_query_stream(influx_connection, query):
+    """
+    Execute an InfluxDB query and stream the resulting records.
+
+    Unlike `run_query`, the results are not loaded into a DataFrame, so callers
+    processing the rows one by one should prefer this function to bound memory.
+
+    Parameters:
+    - influx_connection (dict): InfluxDB connection configuration.
+    - query (str): The InfluxDB Flux query to execute.
+
+    Yields:
+    - influxdb_client.client.flux_table.FluxRecord: The records of the query.
+    """
+    client = connect_influx(influx_connection)
+    query_api = client.query_api()
+    yield from query_api.query_stream(query)
+
 def get_timeseries_by_hash(d_hash, freq, influx_connection, ts_ini, ts_end):
     """
     Retrieve a time series from InfluxDB filtered by hash and time range.
@@ -51,6 +86,7 @@ def get_timeseries_by_hash(d_hash, freq, influx_connection, ts_ini, ts_end):
     Returns:
     - pandas.DataFrame: A DataFrame with time-indexed data.
     """
+    import pandas as pd
     aggregation_window = int(isodate.parse_duration(freq).total_seconds() * 10**9)
     start = int(ts_ini.timestamp()) * 10**9
     end = int(ts_end.timestamp()) * 10**9
@@ -65,11 +101,9 @@ def get_timeseries_by_hash(d_hash, freq, influx_connection, ts_ini, ts_end):
     """
     client = connect_influx(influx_connection)
     query_api = client.query_api()
-    df = query_api.query_data_frame(query)
+    df = query_api.query_data_frame(query, data_frame_index=["_time"])
     if df.empty:
         return pd.DataFrame()
-    df['end'] = pd.to_datetime(df['end'], unit="s").dt.tz_localize("UTC")
-    df.rename(columns={"_time": "start"}, inplace=True)
-    df = df[["start", "end", "isReal", "value"]]
-    df.set_index("start", inplace=True)
-    return df
\ No newline at end of file
+    return df[["end", "isReal", "value"]].assign(
+        end=pd.to_datetime(df["end"], unit="s", utc=True)
+    ).rename_axis("start")
\ No newline at end of file
@@ -0,0 +1,51 @@
+import json
+import re
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# integers orjson can not hold in 64 bits and decodes as floats
+_BIG_INT_RE = re.compile(rb'-\d{19}|\d{20}')
+
+def dumps(v):
+    """
+    Encode a value as JSON, using orjson when installed.
+
+    numpy values and non-string dictionary keys are accepted. Values orjson can
+    not encode, such as integers wider than 64 bits, are encoded with json. Note
+    that orjson encodes NaN and Infinity as null.
+
+    Parameters:
+    - v (object): The value to encode.
+
+    Returns:
+    - bytes: The JSON-encoded value.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(v, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        except TypeError:
+            pass
+    return json.dumps(v).encode("utf-8")
+
+def loads(data):
+    """
+    Decode a JSON document, using orjson when installed.
+
+    Documents orjson would decode differently than json, such as integers wider
+    than 64 bits, or rejects, such as NaN or lone surrogates, are decoded with json.
+
+    Parameters:
+    - data (bytes): The JSON-encoded document.
+
+    Returns:
+    - object: The decoded value.
+    """
+    if orjson is not None and not _BIG_INT_RE.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
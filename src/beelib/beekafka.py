@@ -1,12 +1,17 @@
-import json
-from kafka import KafkaProducer, KafkaConsumer
-from base64 import b64encode, b64decode
+from base64 import b64decode
 import pickle
 import sys
 
+from . import beejson
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 def __pickle_encoder__(v):
     """
-    Encode a value using base64 and pickle.
+    Encode a value using pickle.
 
     Parameters:
     - v (object): The value to encode.
@@ -14,11 +19,12 @@ def __pickle_encoder__(v):
     Returns:
     - bytes: The encoded value.
     """
-    return b64encode(pickle.dumps(v))
+    return pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL)
 
 def __pickle_decoder__(v):
     """
-    Decode a value from base64 and pickle.
+    Decode a pickled value. Values encoded with base64 and pickle by previous
+    versions are also accepted.
 
     Parameters:
     - v (bytes): The encoded value.
@@ -26,8 +32,34 @@ def __pickle_decoder__(v):
     Returns:
     - object: The decoded value.
     """
+    if v[:1] == pickle.PROTO:
+        return pickle.loads(v)
     return pickle.loads(b64decode(v))
 
+def __msgpack_encoder__(v):
+    """
+    Encode a value using msgpack.
+
+    Parameters:
+    - v (object): The value to encode.
+
+    Returns:
+    - bytes: The encoded value.
+    """
+    return msgpack.packb(v, use_bin_type=True)
+
+def __msgpack_decoder__(v):
+    """
+    Decode a msgpack value.
+
+    Parameters:
+    - v (bytes): The encoded value.
+
+    Returns:
+    - object: The decoded value.
+    """
+    return msgpack.unpackb(v, raw=False)
+
 def __json_encoder__(v):
     """
     Encode a value as a JSON string.
@@ -38,7 +70,7 @@ def __json_encoder__(v):
     Returns:
     - bytes: The JSON-encoded value.
     """
-    return json.dumps(v).encode("utf-8")
+    return beejson.dumps(v)
 
 def __json_decoder__(v):
     """
@@ -50,7 +82,7 @@ def __json_decoder__(v):
     Returns:
     - object: The decoded value.
     """
-    return json.loads(v.decode("utf-8"))
+    return beejson.loads(v)
 
 def __plain_decoder_encoder(v):
     """
@@ -70,23 +102,32 @@ def create_kafka_producer(kafka_conf, encoding="JSON", **kwargs):
 
     Parameters:
     - kafka_conf (dict): Kafka configuration containing 'host' and 'port'.
-    - encoding (str, optional): Encoding format ('JSON', 'PICKLE', or 'PLAIN').
-    - **kwargs: Additional arguments for KafkaProducer.
+    - encoding (str, optional): Encoding format ('JSON', 'PICKLE', 'MSGPACK' or 'PLAIN').
+    - **kwargs: Additional arguments for KafkaProducer. By default messages are
+      batched for up to 20 ms (`linger_ms`) in batches of 128 KiB (`batch_size`).
 
     Returns:
     - KafkaProducer: A configured Kafka producer.
 
     Raises:
     - NotImplementedError: If the encoding is unsupported.
+    - ImportError: If the 'MSGPACK' encoding is used and msgpack is not installed.
     """
+    from kafka import KafkaProducer
     if encoding == "PLAIN":
         encoder = __plain_decoder_encoder
     elif encoding == "PICKLE":
         encoder = __pickle_encoder__
+    elif encoding == "MSGPACK":
+        if msgpack is None:
+            raise ImportError("msgpack is required for the MSGPACK encoding")
+        encoder = __msgpack_encoder__
     elif encoding == "JSON":
         encoder = __json_encoder__
     else:
         raise NotImplementedError("Unknown encoding")
+    kwargs.setdefault('linger_ms', 20)
+    kwargs.setdefault('batch_size', 131072)
     servers = [f"{kafka_conf['host']}:{kafka_conf['port']}"]
     return KafkaProducer(bootstrap_servers=servers, value_serializer=encoder, **kwargs)
 
@@ -96,7 +137,7 @@ def create_kafka_consumer(kafka_conf, encoding="JSON", **kwargs):
 
     Parameters:
     - kafka_conf (dict): Kafka configuration containing 'host' and 'port'.
-    - encoding (str, optional): Encoding format ('JSON', 'PICKLE', or 'PLAIN').
+    - encoding (str, optional): Encoding format ('JSON', 'PICKLE', 'MSGPACK' or 'PLAIN').
     - **kwargs: Additional arguments for KafkaConsumer.
 
     Returns:
@@ -104,11 +145,17 @@ def create_kafka_consumer(kafka_conf, encoding="JSON", **kwargs):
 
     Raises:
     - NotImplementedError: If the encoding is unsupported.
+    - ImportError: If the 'MSGPACK' encoding is used and msgpack is not installed.
     """
+    from kafka import KafkaConsumer
     if encoding == "PLAIN":
         decoder = __plain_decoder_encoder
     elif encoding == "PICKLE":
         decoder = __pickle_decoder__
+    elif encoding == "MSGPACK":
+        if msgpack is None:
+            raise ImportError("msgpack is required for the MSGPACK encoding")
+        decoder = __msgpack_decoder__
     elif encoding == "JSON":
         decoder = __json_decoder__
     else:
@@ -138,4 +185,26 @@ def send_to_kafka(producer, topic, key, data, **kwargs):
         else:
             producer.send(topic, value=kafka_message)
     except Exception as e:
-        print(e, file=sys.stderr)
\ No newline at end of file
+        print(e, file=sys.stderr)
+
+def send_to_kafka_many(producer, topic, records, key_field=None, **kwargs):
+    """
+    Send several messages to a Kafka topic and flush the producer once.
+
+    Parameters:
+    - producer (KafkaProducer): The Kafka producer.
+    - topic (str): The target topic.
+    - records (iterable): Message values, each sent as the "data" of a message.
+    - key_field (str, optional): Field of each record to use as message key.
+    - **kwargs: Additional metadata to include in every message.
+    """
+    try:
+        for r in records:
+            kafka_message = {"data": r, **kwargs}
+            key = r[key_field] if key_field else None
+            if key:
+                producer.send(topic, key=key.encode('utf-8'), value=kafka_message)
+            else:
+                producer.send(topic, value=kafka_message)
+    finally:
+        producer.flush()
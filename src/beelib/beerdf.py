@@ -1,6 +1,6 @@
-from neo4j import GraphDatabase
-from rdflib import graph, RDF
-import rdflib
+import re
+
+_LANG_RE = re.compile(r'^[a-zA-Z]{1,8}(-[a-zA-Z0-9]{1,8})*$')
 
 def __get_namespaced_fields__(field, context):
     """
@@ -30,6 +30,8 @@ def create_rdf_from_neo4j(neo4j_graph, context):
     Returns:
     - rdflib.Graph: An RDF graph.
     """
+    import rdflib
+    from rdflib import graph, RDF
     context_ns = {}
     for c in context.nodes:
         for k, v in c.items():
@@ -37,6 +39,8 @@ def create_rdf_from_neo4j(neo4j_graph, context):
             context_ns[k] = prefix_tmp
 
     g = graph.Graph()
+    # collect the triples to add them in a single batch
+    triples = []
     # create the nodes
     for n in neo4j_graph.nodes:
         # get the subject
@@ -45,13 +49,17 @@ def create_rdf_from_neo4j(neo4j_graph, context):
         except:
             continue
         # set the type of the class
-        for k in [t for t in n.labels if t != "Resource"]:
+        for k in n.labels:
+            if k == "Resource":
+                continue
             lab = __get_namespaced_fields__(k, context_ns)
             if not lab:
                 continue
-            g.add((subject, RDF.type, lab))
+            triples.append((subject, RDF.type, lab, g))
         # set the data properties
-        for k in [p for p in n.keys() if p != "uri" and "@" not in p]:
+        for k in n.keys():
+            if k == "uri" or "@" in k:
+                continue
             lab = __get_namespaced_fields__(k, context_ns)
             if not lab:
                 continue
@@ -59,18 +67,17 @@ def create_rdf_from_neo4j(neo4j_graph, context):
             if isinstance(item, list):
                 for item_val in item:
                     if isinstance(item_val, str):
-                        text = item_val.split("@")[0]
-                        try:
-                            lang = item_val.split("@")[1]
+                        text, sep, lang = item_val.rpartition("@")
+                        if sep and _LANG_RE.match(lang):
                             v = rdflib.Literal(text, lang=lang)
-                        except:
-                            v = rdflib.Literal(text)
+                        else:
+                            v = rdflib.Literal(item_val)
                     else:
                         v = rdflib.Literal(item_val)
-                    g.add((subject, lab, v))
+                    triples.append((subject, lab, v, g))
             else:
                 v = rdflib.Literal(item)
-                g.add((subject, lab, v))
+                triples.append((subject, lab, v, g))
 
     for r in neo4j_graph.relationships:
         rel_type = __get_namespaced_fields__(r.type, context_ns)
@@ -79,9 +86,10 @@ def create_rdf_from_neo4j(neo4j_graph, context):
         try:
             subject_orig = rdflib.URIRef(r.start_node.get('uri'))
             subject_end = rdflib.URIRef(r.end_node.get('uri'))
-            g.add((subject_orig, rel_type, subject_end))
+            triples.append((subject_orig, rel_type, subject_end, g))
         except:
             pass
+    g.addN(triples)
     for k, v in context_ns.items():
         g.bind(k, v)
 
@@ -98,6 +106,7 @@ def get_rdf_with_cyper_query(query, connection):
     Returns:
     - rdflib.Graph: An RDF graph.
     """
+    from neo4j import GraphDatabase
     driver = GraphDatabase.driver(**connection)
     with driver.session() as session:
         users = session.run(
@@ -1,92 +1,146 @@
 import base64
+import functools
 import hashlib
 import os
 
-from Crypto import Random
-from Crypto.Cipher import AES
+BLOCK_SIZE = 16
+SALT_SIZE = 16
+NONCE_SIZE = 12
 
-def pad(s):
+def __derive_key__(password, salt):
     """
-    Pad a string to fit AES block size (16 bytes).
+    Derive an AES-256 key from a password and salt using Scrypt.
 
     Parameters:
-    - s (str): The input string.
+    - password (bytes): The password.
+    - salt (bytes): The salt.
 
     Returns:
-    - str: The padded string.
+    - bytes: The 32 bytes private key.
     """
-    block_size = AES.block_size
-    remainder = len(s) % block_size
-    padding_needed = block_size - remainder
-    return s + padding_needed * ' '
+    return hashlib.scrypt(password, salt=salt, n=2 ** 14, r=8, p=1, dklen=32)
 
-def un_pad(s):
+@functools.lru_cache(maxsize=1024)
+def __derive_key_cached__(password, salt):
     """
-    Remove padding from a string.
+    Derive an AES-256 key like `__derive_key__`, caching the result so decrypting
+    many values that share a password and salt only runs the KDF once. Note that
+    both the passwords and the derived keys are kept in memory.
 
     Parameters:
-    - s (str): The padded string.
+    - password (bytes): The password.
+    - salt (bytes): The salt.
 
     Returns:
-    - str: The unpadded string.
+    - bytes: The 32 bytes private key.
     """
+    return __derive_key__(password, salt)
+
+def __un_pad_cbc__(s):
+    """
+    Remove the padding of a legacy AES-CBC plaintext, either PKCS7 or the spaces
+    used by older versions.
+
+    Parameters:
+    - s (bytes): The padded bytes.
+
+    Returns:
+    - bytes: The unpadded bytes.
+    """
+    if 0 < s[-1] <= BLOCK_SIZE:
+        return s[:-s[-1]]
     return s.rstrip()
 
 def encrypt(plain_text, password):
     """
-    Encrypt a plaintext string using AES with a password.
+    Encrypt a plaintext string using AES-256-GCM with a password.
 
     Parameters:
     - plain_text (str): The plaintext to encrypt.
     - password (str): The password used for encryption.
 
     Returns:
-    - str: The base64-encoded encrypted string with salt and IV.
+    - str: The base64-encoded salt, nonce and encrypted text.
     """
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
     # generate a random salt
-    salt = os.urandom(AES.block_size)
+    salt = os.urandom(SALT_SIZE)
 
-    # generate a random iv
-    iv = Random.new().read(AES.block_size)
+    # generate a random nonce
+    nonce = os.urandom(NONCE_SIZE)
 
     # use the Scrypt KDF to get a private key from the password
-    private_key = hashlib.scrypt(password.encode(), salt=salt, n=2 ** 14, r=8, p=1, dklen=32)
+    private_key = __derive_key__(password.encode(), salt)
 
-    # pad text with spaces to be valid for AES CBC mode
-    padded_text = pad(plain_text)
+    # encrypt and authenticate the text
+    cipher_text = AESGCM(private_key).encrypt(nonce, plain_text.encode(), None)
 
-    # create cipher config
-    cipher_config = AES.new(private_key, AES.MODE_CBC, iv)
-    # return string with encrypted text
-    return (base64.b64encode(cipher_config.encrypt(padded_text.encode())) + base64.b64encode(salt) + base64.b64encode(
-        iv)).decode()
+    # return string with salt, nonce and encrypted text
+    return base64.b64encode(salt + nonce + cipher_text).decode()
 
-def decrypt(enc_str, password):
+def __decrypt_cbc__(enc_str, password):
     """
-    Decrypt a base64-encoded encrypted string.
+    Decrypt a string encrypted with AES-CBC by previous versions.
 
     Parameters:
-    - enc_str (str): The encrypted string with salt and IV.
+    - enc_str (str): The encrypted text, salt and IV, each one base64-encoded.
     - password (str): The password used for decryption.
 
     Returns:
     - str: The decrypted plaintext.
     """
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
     # decode the dictionary entries from base64
     iv = base64.b64decode(enc_str[-24:])
     salt = base64.b64decode(enc_str[-48:-24])
     enc = base64.b64decode(enc_str[:-48])
 
     # generate the private key from the password and salt
-    private_key = hashlib.scrypt(password.encode(), salt=salt, n=2 ** 14, r=8, p=1, dklen=32)
+    private_key = __derive_key_cached__(password.encode(), salt)
 
     # create the cipher config
-    cipher = AES.new(private_key, AES.MODE_CBC, iv)
+    decryptor = Cipher(algorithms.AES(private_key), modes.CBC(iv)).decryptor()
 
     # decrypt the cipher text
-    decrypted = cipher.decrypt(enc)
+    decrypted = decryptor.update(enc) + decryptor.finalize()
+
+    # un pad the text to remove the added padding
+    original = __un_pad_cbc__(decrypted)
+
+    return original.decode('utf-8')
+
+def decrypt(enc_str, password):
+    """
+    Decrypt a base64-encoded encrypted string. Strings encrypted with AES-CBC
+    by previous versions are also accepted.
 
-    # un pad the text to remove the added spaces
-    original = un_pad(decrypted)
+    Parameters:
+    - enc_str (str): The encrypted string with salt and nonce.
+    - password (str): The password used for decryption.
+
+    Returns:
+    - str: The decrypted plaintext.
+
+    Raises:
+    - cryptography.exceptions.InvalidTag: If the password is wrong or the data was modified.
+    """
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+    # the legacy format concatenates three base64 strings, so the salt padding
+    # appears in the middle of the string
+    if enc_str[-26:-24] == "==":
+        return __decrypt_cbc__(enc_str, password)
+
+    # split the salt, nonce and encrypted text without copying the encrypted text
+    raw = memoryview(base64.b64decode(enc_str))
+    salt = bytes(raw[:SALT_SIZE])
+    nonce = raw[SALT_SIZE:SALT_SIZE + NONCE_SIZE]
+    enc = raw[SALT_SIZE + NONCE_SIZE:]
+
+    # generate the private key from the password and salt
+    private_key = __derive_key_cached__(password.encode(), salt)
 
-    return original.decode('utf-8')
\ No newline at end of file
+    # decrypt and verify the cipher text
+    return AESGCM(private_key).decrypt(nonce, enc, None).decode('utf-8')
@@ -2,10 +2,15 @@ import hashlib
 import tempfile
 from urllib.parse import quote
 
-from neo4j import GraphDatabase
-import json
-import morph_kgc
 import os
+import re
+import string
+
+from . import beejson
+
+_QUOTES_RE = re.compile(r"\\\"|'")
+# characters quote() leaves untouched with safe=':/#'
+_URI_SAFE = frozenset(string.ascii_letters + string.digits + ":/#-._~")
 
 def __map_to_ttl__(data, mapping_file):
     """
@@ -18,12 +23,18 @@ def __map_to_ttl__(data, mapping_file):
     Returns:
     - rdflib.Graph: An RDF graph in Turtle format.
     """
+    import morph_kgc
     morph_config = "[DataSource1]\nmappings:{mapping_file}\nfile_path: {d_file}"
-    with tempfile.NamedTemporaryFile(mode='w', delete=False, dir=".", suffix=".json") as d_file:
-        json.dump({k: v for k, v in data.items()}, d_file)
-    g_rdflib = morph_kgc.materialize(morph_config.format(mapping_file=mapping_file, d_file=d_file.name))
-    os.unlink(d_file.name)
-    return g_rdflib
+    fd, d_file = tempfile.mkstemp(dir=".", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(beejson.dumps(data))
+        return morph_kgc.materialize(morph_config.format(mapping_file=mapping_file, d_file=d_file))
+    finally:
+        try:
+            os.unlink(d_file)
+        except OSError:
+            pass
 
 def __transform_to_str__(graph):
     """
@@ -35,10 +46,7 @@ def __transform_to_str__(graph):
     Returns:
     - str: The Turtle-formatted string.
     """
-    content = graph.serialize(format="ttl")
-    content = content.replace("\\\"", "&apos;")
-    content = content.replace("'", "&apos;")
-    return content
+    return _QUOTES_RE.sub("&apos;", graph.serialize(format="ttl"))
 
 def map_and_save(data, mapping_file, config):
     """
@@ -72,6 +80,7 @@ def save_to_neo4j(g, config):
     - g (rdflib.Graph): The RDF graph.
     - config (dict): Neo4j connection configuration.
     """
+    from neo4j import GraphDatabase
     content = __transform_to_str__(g)
     neo = GraphDatabase.driver(**config['neo4j'])
     with neo.session() as s:
@@ -88,12 +97,12 @@ def print_graph(g, config):
     - g (rdflib.Graph): The RDF graph.
     - config (dict): Configuration for output (e.g., 'print_file').
     """
-    content = __transform_to_str__(g)
+    content = g.serialize(format="ttl")
     if 'print_file' in config and config['print_file']:
         with open(config['print_file'], "w") as f:
-            f.write(content)
+            f.write(_QUOTES_RE.sub("&apos;", content))
     else:
-        print(g.serialize(format="ttl"))
+        print(content)
 
 def create_hash(uri):
     """
@@ -105,7 +114,20 @@ def create_hash(uri):
     Returns:
     - str: The hexadecimal hash.
     """
-    uri = quote(uri, safe=':/#')
-    uri = uri.encode()
-    m = hashlib.sha256(uri)
-    return m.hexdigest()
\ No newline at end of file
+    if _URI_SAFE.issuperset(uri):
+        uri = uri.encode('ascii')
+    else:
+        uri = quote(uri, safe=':/#').encode()
+    return hashlib.sha256(uri).hexdigest()
+
+def create_hashes(uris):
+    """
+    Generate SHA-256 hashes for several URIs.
+
+    Parameters:
+    - uris (iterable): The URIs to hash.
+
+    Returns:
+    - list: The hexadecimal hashes, in the same order as `uris`.
+    """
+    return [create_hash(uri) for uri in uris]